@@ -7,10 +7,16 @@ Discord Money Collection Tracker Bot
 """
 
 import os
-import json
+import re
+import sys
+import atexit
+import signal
+import asyncio
+import orjson
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands
+from collections import defaultdict
 from datetime import datetime, timedelta
 from pathlib import Path
 from dotenv import load_dotenv
@@ -22,9 +28,35 @@ TOKEN = os.getenv('DISCORD_TOKEN')
 REPORT_CHANNEL_ID = os.getenv('REPORT_CHANNEL_ID')
 
 # Configuration
-DATA_FILE = "collection_data.json"
-DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-COLLECTION_DAYS = [1, 2, 3, 4, 5]  # Tuesday=1 to Saturday=5
+DATA_FILE = "collection_data.json"  # Members and report channel
+PAYMENTS_FILE = "payments.jsonl"  # One payment per line, append-only
+SAVE_DELAY = 0.25  # Seconds to wait so bursts of changes share one write
+# Everything the bot needs to know about a weekday, indexed by datetime.weekday()
+WEEKDAY_INFO = [
+    {"name": "Monday", "collection": False, "days_since_tue": 6},
+    {"name": "Tuesday", "collection": True, "days_since_tue": 0},
+    {"name": "Wednesday", "collection": True, "days_since_tue": 1},
+    {"name": "Thursday", "collection": True, "days_since_tue": 2},
+    {"name": "Friday", "collection": True, "days_since_tue": 3},
+    {"name": "Saturday", "collection": True, "days_since_tue": 4},
+    {"name": "Sunday", "collection": False, "days_since_tue": 5},
+]
+DAYS = [info["name"] for info in WEEKDAY_INFO]
+# '@username amount paid', one payment per line; the amount is the last number
+# on the line ('50', '50.', '.5') and anything after it (e.g. 'paid thanks',
+# a closing '.' or '!') is ignored
+PAYMENT_RE = re.compile(
+    r"^[ \t]*@[ \t]*(?P<user>.+)[ \t]+(?P<amt>\d+(?:\.\d*)?|\.\d+)(?=[ \t]|paid|[^\w\s]|$)",
+    re.IGNORECASE | re.MULTILINE,
+)
+PAYMENT_PROBE = re.compile(r"@.*\d")  # Cheap first check before anything else
+
+# Static pieces of the weekly report
+REPORT_RULE = "=" * 50
+REPORT_DIVIDER = "-" * 40
+REPORT_HEADER = f"```\n{REPORT_RULE}\n📊 WEEKLY MONEY COLLECTION REPORT\n"
+REPORT_BREAKDOWN_HEADER = f"{REPORT_RULE}\n\n📋 DAILY BREAKDOWN:\n{REPORT_DIVIDER}\n"
+REPORT_SUMMARY_HEADER = f"\n{REPORT_DIVIDER}\n👥 MEMBER SUMMARY:\n{REPORT_DIVIDER}\n"
 
 # Bot setup
 intents = discord.Intents.default()
@@ -33,48 +65,262 @@ intents.members = True
 
 bot = commands.Bot(command_prefix='!', intents=intents)
 
+# In-memory copy of DATA_FILE, loaded on first use and refreshed on save
+_DATA_CACHE = None
+# The one cold load every handler waits on, so loading never runs twice at once
+_load_task = None
+
+# Changes not yet written to disk, flushed together after SAVE_DELAY
+_dirty = False
+_pending_payments = []
+_flush_task = None
+# Serializes appends and truncation of PAYMENTS_FILE across worker threads;
+# created on first use so it belongs to the loop bot.run() starts
+_payments_lock = None
+
+# Background task that posts the Sunday report
+_sunday_task = None
+
 
 # ============== Data Management ==============
 
+def write_atomic(path, payload):
+    """Write bytes to a temp file and swap it in, so readers never see half a file."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_payments():
+    """Load all recorded payments from the JSON-Lines file."""
+    if not Path(PAYMENTS_FILE).exists():
+        return []
+    raw = Path(PAYMENTS_FILE).read_bytes()
+
+    # A crash mid-append leaves a partial last line without its newline.
+    # Cut it off so the next append starts on a fresh line.
+    if raw and not raw.endswith(b"\n"):
+        raw = raw[:raw.rfind(b"\n") + 1]
+        with open(PAYMENTS_FILE, "r+b") as f:
+            f.truncate(len(raw))
+        print(f"⚠️ Dropped a partial last line from {PAYMENTS_FILE}")
+
+    payments = []
+    for line_no, line in enumerate(raw.splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            payments.append(orjson.loads(line))
+        except orjson.JSONDecodeError:
+            print(f"⚠️ Skipping unreadable line {line_no} in {PAYMENTS_FILE}")
+    return payments
+
+
+def migrate_legacy_data():
+    """Move payments stored inline in older data files into PAYMENTS_FILE."""
+    if not Path(DATA_FILE).exists():
+        return
+    data = orjson.loads(Path(DATA_FILE).read_bytes())
+    if "payments" not in data:
+        return
+
+    # An existing PAYMENTS_FILE means an earlier migration already got this far
+    legacy_payments = data.pop("payments")
+    if legacy_payments and not Path(PAYMENTS_FILE).exists():
+        write_atomic(PAYMENTS_FILE, b"".join(orjson.dumps(p) + b"\n" for p in legacy_payments))
+        print(f"✅ Moved {len(legacy_payments)} payment(s) from {DATA_FILE} to {PAYMENTS_FILE}")
+    write_atomic(
+        DATA_FILE,
+        orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS),
+    )
+
+
 def load_data():
-    """Load existing data from JSON file."""
+    """Load existing data from the JSON and JSON-Lines files."""
     if Path(DATA_FILE).exists():
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    return {"payments": [], "members": [], "report_channel": None}
+        data = orjson.loads(Path(DATA_FILE).read_bytes())
+    else:
+        data = {"members": [], "report_channel": None}
+
+    data["payments"] = load_payments()
+    return data
+
+
+def build_date_index(payments):
+    """Group payments by their date string."""
+    by_date = defaultdict(list)
+    for p in payments:
+        by_date[p["date"]].append(p)
+    return by_date
+
+
+def load_cache_data():
+    """Load data from disk and build the in-memory indexes."""
+    migrate_legacy_data()
+    data = load_data()
+    data["_by_date"] = build_date_index(data["payments"])
+    data["_members_set"] = set(data.setdefault("members", []))
+    return data
+
+
+def get_data():
+    """Return the cached data, loading it from disk on first use."""
+    global _DATA_CACHE
+    if _DATA_CACHE is None:
+        _DATA_CACHE = load_cache_data()
+    return _DATA_CACHE
+
+
+async def _load_cache():
+    """Fill the cache from disk in a worker thread."""
+    global _DATA_CACHE
+    _DATA_CACHE = await asyncio.to_thread(load_cache_data)
+
+
+async def get_data_async():
+    """Return the cached data, loading it in a worker thread on first use."""
+    global _load_task
+    if _DATA_CACHE is None:
+        if _load_task is None:
+            _load_task = asyncio.create_task(_load_cache())
+        task = _load_task
+        try:
+            # Shielded so one cancelled handler doesn't cancel the shared load
+            await asyncio.shield(task)
+        except Exception:
+            # Let the next caller try again
+            if _load_task is task:
+                _load_task = None
+            raise
+    return _DATA_CACHE
 
 
 def save_data(data):
-    """Save data to JSON file."""
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=2, default=str)
+    """Save members and settings to JSON file and refresh the cache."""
+    global _DATA_CACHE
+    # Payments live in PAYMENTS_FILE; underscore keys are in-memory indexes
+    meta = {k: v for k, v in data.items() if k != "payments" and not k.startswith("_")}
+    write_atomic(
+        DATA_FILE,
+        orjson.dumps(meta, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS),
+    )
+    _DATA_CACHE = data
 
 
-# ============== Helper Functions ==============
+async def save_data_async(data):
+    """Save data in a worker thread so the event loop keeps running."""
+    await asyncio.to_thread(save_data, data)
+
+
+def append_payments(payments):
+    """Append payments to the JSON-Lines file."""
+    with open(PAYMENTS_FILE, "ab") as f:
+        f.write(b"".join(orjson.dumps(p) + b"\n" for p in payments))
+
+
+def _get_payments_lock():
+    """Return the PAYMENTS_FILE lock, creating it inside the running loop."""
+    global _payments_lock
+    if _payments_lock is None:
+        _payments_lock = asyncio.Lock()
+    return _payments_lock
+
+
+def _schedule_flush():
+    """Start a delayed flush unless one is already pending."""
+    global _flush_task
+    if _flush_task is None:
+        _flush_task = asyncio.create_task(_flush_after(SAVE_DELAY))
 
-def is_collection_day():
-    """Check if today is a collection day (Tuesday-Saturday)."""
-    return datetime.now().weekday() in COLLECTION_DAYS
 
+async def _flush_after(delay):
+    """Wait for more changes to arrive, then write them all at once."""
+    global _flush_task
+    try:
+        # Keep going while changes arrive during a write, so writes never overlap
+        while True:
+            await asyncio.sleep(delay)
+            await flush_data()
+            if not (_dirty or _pending_payments):
+                break
+    except Exception as e:
+        # The unsaved changes were put back; the next change retries them
+        print(f"❌ Failed to save data: {e}")
+    finally:
+        _flush_task = None
+
+
+async def flush_data():
+    """Write pending payments and settings to disk."""
+    global _dirty, _pending_payments
+    async with _get_payments_lock():
+        payments, _pending_payments = _pending_payments, []
+        if payments:
+            try:
+                await asyncio.to_thread(append_payments, payments)
+            except Exception:
+                _pending_payments = payments + _pending_payments
+                raise
+
+    dirty, _dirty = _dirty, False
+    if dirty:
+        try:
+            await save_data_async(_DATA_CACHE)
+        except Exception:
+            _dirty = True
+            raise
+
+
+def flush_data_sync():
+    """Write pending changes immediately (used on shutdown)."""
+    global _dirty, _pending_payments
+    payments, _pending_payments = _pending_payments, []
+    dirty, _dirty = _dirty, False
+    if payments:
+        append_payments(payments)
+    if dirty:
+        save_data(_DATA_CACHE)
+
+
+def schedule_save():
+    """Mark members and settings as changed and schedule a write."""
+    global _dirty
+    _dirty = True
+    _schedule_flush()
+
+
+def record_payments(payments):
+    """Record new payments in the cache and schedule them for writing."""
+    data = get_data()
+    data["payments"].extend(payments)
+    for p in payments:
+        data["_by_date"][p["date"]].append(p)
+    _pending_payments.extend(payments)
+    _schedule_flush()
+
+
+async def clear_payments():
+    """Remove all recorded payments."""
+    data = await get_data_async()
+    # Wait for any flush that is mid-append, so the truncate always lands last
+    async with _get_payments_lock():
+        data["payments"] = []
+        data["_by_date"] = defaultdict(list)
+        _pending_payments.clear()
+        await asyncio.to_thread(write_atomic, PAYMENTS_FILE, b"")
 
-def is_report_day():
-    """Check if today is Sunday (report day)."""
-    return datetime.now().weekday() == 6
 
+# ============== Helper Functions ==============
 
 def get_week_range():
     """Get the date range for the current reporting week (Tuesday to Saturday)."""
     today = datetime.now()
-    current_weekday = today.weekday()
-
-    if current_weekday == 6:  # Sunday
-        days_since_tuesday = 5
-    elif current_weekday >= 1:
-        days_since_tuesday = current_weekday - 1
-    else:  # Monday
-        days_since_tuesday = 6
+    info = WEEKDAY_INFO[today.weekday()]
 
-    tuesday = today - timedelta(days=days_since_tuesday)
+    tuesday = today - timedelta(days=info["days_since_tue"])
     saturday = tuesday + timedelta(days=4)
 
     return tuesday.date(), saturday.date()
@@ -83,58 +329,48 @@ def get_week_range():
 def generate_weekly_report(data):
     """Generate the full weekly report (Tuesday to Saturday)."""
     tuesday, saturday = get_week_range()
+    week_days = [tuesday + timedelta(days=i) for i in range(5)]
+    day_meta = [(d.strftime("%Y-%m-%d"), DAYS[d.weekday()]) for d in week_days]
 
-    report = "```\n"
-    report += "=" * 50 + "\n"
-    report += "📊 WEEKLY MONEY COLLECTION REPORT\n"
-    report += f"📆 {tuesday.strftime('%B %d')} - {saturday.strftime('%B %d, %Y')}\n"
-    report += "=" * 50 + "\n\n"
+    by_day = [data["_by_date"].get(date_str, []) for date_str, _ in day_meta]
 
-    report += "📋 DAILY BREAKDOWN:\n"
-    report += "-" * 40 + "\n"
+    parts = [REPORT_HEADER]
+    parts.append(f"📆 {tuesday.strftime('%B %d')} - {saturday.strftime('%B %d, %Y')}\n")
+    parts.append(REPORT_BREAKDOWN_HEADER)
 
-    current_date = tuesday
+    # Render each day and accumulate the totals in the same pass
     week_total = 0
-    member_totals = {member: 0 for member in data.get("members", [])}
-    member_days = {member: [] for member in data.get("members", [])}
+    member_totals = defaultdict(float)
+    member_days = defaultdict(list)
+
+    for (date_str, day_name), day_payments in zip(day_meta, by_day):
+        if not day_payments:
+            parts.append(f"\n📅 {day_name} ({date_str}):\n   No payments recorded\n")
+            continue
 
-    while current_date <= saturday:
-        date_str = current_date.strftime("%Y-%m-%d")
-        day_name = DAYS[current_date.weekday()]
-        day_payments = [p for p in data["payments"] if p["date"] == date_str]
+        short_name = day_name[:3]
+        for p in day_payments:
+            member_totals[p['username']] += p['amount']
+            member_days[p['username']].append(short_name)
 
-        report += f"\n📅 {day_name} ({date_str}):\n"
+        # One chunk per day: header, every payment line, and the daily total
+        daily_total = sum(p['amount'] for p in day_payments)
+        lines = "".join(f"   • @{p['username']}: ${p['amount']:.2f}\n" for p in day_payments)
+        parts.append(f"\n📅 {day_name} ({date_str}):\n{lines}   Daily Total: ${daily_total:.2f}\n")
+        week_total += daily_total
 
-        if not day_payments:
-            report += "   No payments recorded\n"
-        else:
-            daily_total = 0
-            for p in day_payments:
-                report += f"   • @{p['username']}: ${p['amount']:.2f}\n"
-                daily_total += p['amount']
-                week_total += p['amount']
-                if p['username'] in member_totals:
-                    member_totals[p['username']] += p['amount']
-                    member_days[p['username']].append(day_name[:3])
-            report += f"   Daily Total: ${daily_total:.2f}\n"
-
-        current_date += timedelta(days=1)
-
-    report += "\n" + "-" * 40 + "\n"
-    report += "👥 MEMBER SUMMARY:\n"
-    report += "-" * 40 + "\n"
-
-    for member, total in member_totals.items():
+    parts.append(REPORT_SUMMARY_HEADER)
+
+    # dict.fromkeys drops repeated names (e.g. from /setup) but keeps the order
+    for member in dict.fromkeys(data.get("members", [])):
+        total = member_totals.get(member, 0)
         status = "✅" if total > 0 else "❌"
-        days = ", ".join(member_days[member]) if member_days[member] else "None"
-        report += f"{status} @{member}: ${total:.2f} (Days: {days})\n"
+        days = ", ".join(member_days[member]) if member in member_days else "None"
+        parts.append(f"{status} @{member}: ${total:.2f} (Days: {days})\n")
 
-    report += "\n" + "=" * 50 + "\n"
-    report += f"💰 WEEKLY TOTAL: ${week_total:.2f}\n"
-    report += "=" * 50 + "\n"
-    report += "```"
+    parts.append(f"\n{REPORT_RULE}\n💰 WEEKLY TOTAL: ${week_total:.2f}\n{REPORT_RULE}\n```")
 
-    return report
+    return "".join(parts)
 
 
 # ============== Bot Events ==============
@@ -151,53 +387,36 @@ async def on_ready():
     except Exception as e:
         print(f"❌ Failed to sync commands: {e}")
 
-    # Start the Sunday report task
-    if not sunday_report.is_running():
-        sunday_report.start()
+    # Start the Sunday report task (on_ready fires again after reconnects)
+    global _sunday_task
+    if _sunday_task is None or _sunday_task.done():
+        _sunday_task = asyncio.create_task(sunday_report_loop())
+
+    # Load the data now so the first message doesn't wait on disk
+    try:
+        await get_data_async()
+    except Exception as e:
+        print(f"❌ Failed to load data: {e}")
 
 
-def parse_payment_line(line, members):
+def parse_payment_line(line, members_lower):
     """
     Parse a single payment line like '@username 10 paid' or '@first last 10 paid'
+    `members_lower` maps lowercased member names to their stored spelling
     Returns (username, amount) or (None, None) if invalid
     """
-    line = line.strip().lower()
-
-    if not line.startswith('@'):
+    m = PAYMENT_RE.match(line.strip())
+    if not m:
         return None, None
 
-    # Remove 'paid' keyword
-    line = line.replace(' paid', '').replace('paid', '')
-
-    # Try to find amount (last number in the line)
-    parts = line.split()
-    if len(parts) < 2:
+    # 'paid' may also come before the amount ('@john paid 50')
+    username = " ".join(w for w in m["user"].lower().split() if w != "paid")
+    if not username:
         return None, None
-
-    # Find the amount (should be a number)
-    amount = None
-    amount_index = -1
-
-    for i in range(len(parts) - 1, 0, -1):
-        try:
-            amount = float(parts[i])
-            amount_index = i
-            break
-        except ValueError:
-            continue
-
-    if amount is None:
-        return None, None
-
-    # Username is everything between @ and the amount
-    username = ' '.join(parts[0:amount_index])[1:]  # Remove @
+    amount = float(m["amt"])
 
     # Try to match with existing members (case-insensitive)
-    for member in members:
-        if member.lower() == username.lower():
-            return member, amount
-
-    return username, amount
+    return members_lower.get(username, username), amount
 
 
 @bot.event
@@ -208,126 +427,146 @@ async def on_message(message):
 
     content = message.content.strip()
 
-    # Check if message contains @ and a number (potential payment)
-    if '@' in content and any(char.isdigit() for char in content):
-        # Check if it's a collection day
-        if not is_collection_day():
-            day_name = DAYS[datetime.now().weekday()]
-            await message.channel.send(f"❌ Today is {day_name}. Collection is only **Tuesday to Saturday**!")
-            await bot.process_commands(message)
-            return
-
-        data = load_data()
-        members = data.get("members", [])
-
-        # Split by lines to handle multiple payments
-        lines = content.split('\n')
-
-        recorded_payments = []
-        errors = []
-
-        for line in lines:
-            line = line.strip()
-            if not line.startswith('@'):
-                continue
-
-            username, amount = parse_payment_line(line, members)
-
-            if username is None:
-                continue
-
-            # Check if member exists (case-insensitive match)
-            member_match = None
-            for m in members:
-                if m.lower() == username.lower():
-                    member_match = m
-                    break
-
-            if not member_match:
-                errors.append(f"⚠️ **@{username}** not in member list")
-                continue
-
-            # Record payment
-            now = datetime.now()
-            payment = {
-                "username": member_match,
-                "amount": amount,
-                "date": now.strftime("%Y-%m-%d"),
-                "time": now.strftime("%H:%M:%S"),
-                "day": DAYS[now.weekday()],
-                "recorded_by": str(message.author)
-            }
-            data["payments"].append(payment)
-            recorded_payments.append(payment)
-
-        # Save if any payments recorded
-        if recorded_payments:
-            save_data(data)
-
-            # Get today's summary
-            now = datetime.now()
-            today_str = now.strftime("%Y-%m-%d")
-            today_payments = [p for p in data["payments"] if p["date"] == today_str]
-            today_total = sum(p["amount"] for p in today_payments)
-
-            paid_users = set(p["username"] for p in today_payments)
-            pending = [m for m in members if m not in paid_users]
-
-            # Build response
-            if len(recorded_payments) == 1:
-                p = recorded_payments[0]
-                response = (
-                    f"✅ **Payment Recorded!**\n"
-                    f"👤 Member: **@{p['username']}**\n"
-                    f"💵 Amount: **${p['amount']:.2f}**\n"
-                    f"📅 {p['day']}, {p['date']}\n\n"
-                )
-            else:
-                response = f"✅ **{len(recorded_payments)} Payments Recorded!**\n"
-                for p in recorded_payments:
-                    response += f"• @{p['username']}: ${p['amount']:.2f}\n"
-                response += "\n"
-
-            response += f"📊 **Today's Total: ${today_total:.2f}**\n"
-
-            if pending:
-                response += f"⏳ Pending: {', '.join('@' + u for u in pending)}"
-            else:
-                response += "🎉 All members have paid today!"
-
-            # Add errors if any
-            if errors:
-                response += "\n\n" + "\n".join(errors)
-
-            await message.channel.send(response)
-
-        elif errors:
-            await message.channel.send("\n".join(errors) + "\n\nUse `/addmember name` to add members.")
+    # Check if message contains @ followed by a number (potential payment)
+    if not PAYMENT_PROBE.search(content):
+        await bot.process_commands(message)
+        return
+
+    # Nothing that looks like '@user amount' on its own line, so not a payment
+    # (checked before the day check so ordinary mentions don't get a warning)
+    if not PAYMENT_RE.search(content):
+        await bot.process_commands(message)
+        return
+
+    # Read the clock once for the whole message
+    now = datetime.now()
+    info = WEEKDAY_INFO[now.weekday()]
+    day_name = info["name"]
+    today_str = now.strftime("%Y-%m-%d")
+
+    # Check if it's a collection day
+    if not info["collection"]:
+        await message.channel.send(f"❌ Today is {day_name}. Collection is only **Tuesday to Saturday**!")
+        await bot.process_commands(message)
+        return
+
+    data = await get_data_async()
+    members = data.get("members", [])
+    members_lower = {m.lower(): m for m in members}
+
+    # Split by lines to handle multiple payments
+    lines = content.split('\n')
+
+    recorded_payments = []
+    errors = []
+
+    for line in lines:
+        line = line.strip()
+        if not line.startswith('@'):
+            continue
+
+        username, amount = parse_payment_line(line, members_lower)
+
+        if username is None:
+            continue
+
+        if username.lower() not in members_lower:
+            errors.append(f"⚠️ **@{username}** not in member list")
+            continue
+
+        # Record payment
+        payment = {
+            "username": username,
+            "amount": amount,
+            "date": today_str,
+            "time": now.strftime("%H:%M:%S"),
+            "day": day_name,
+            "recorded_by": str(message.author)
+        }
+        recorded_payments.append(payment)
+
+    # Save if any payments recorded
+    if recorded_payments:
+        record_payments(recorded_payments)
+
+        # Get today's summary
+        today_payments = data["_by_date"].get(today_str, [])
+        today_total = sum(p["amount"] for p in today_payments)
+
+        paid_users = set(p["username"] for p in today_payments)
+        pending = [m for m in members if m not in paid_users]
+
+        # Build response
+        if len(recorded_payments) == 1:
+            p = recorded_payments[0]
+            chunks = [
+                "✅ **Payment Recorded!**",
+                f"👤 Member: **@{p['username']}**",
+                f"💵 Amount: **${p['amount']:.2f}**",
+                f"📅 {p['day']}, {p['date']}",
+            ]
+        else:
+            chunks = [f"✅ **{len(recorded_payments)} Payments Recorded!**"]
+            chunks.extend(f"• @{p['username']}: ${p['amount']:.2f}" for p in recorded_payments)
+        chunks.append("")
+
+        chunks.append(f"📊 **Today's Total: ${today_total:.2f}**")
+
+        if pending:
+            chunks.append(f"⏳ Pending: {', '.join('@' + u for u in pending)}")
+        else:
+            chunks.append("🎉 All members have paid today!")
+
+        # Add errors if any
+        if errors:
+            chunks.append("")
+            chunks.extend(errors)
+
+        await message.channel.send("\n".join(chunks))
+
+    elif errors:
+        await message.channel.send("\n".join(errors) + "\n\nUse `/addmember name` to add members.")
 
     await bot.process_commands(message)
 
 
 # ============== Scheduled Tasks ==============
 
-@tasks.loop(hours=1)
-async def sunday_report():
-    """Automatically post weekly report on Sunday."""
-    now = datetime.now()
+def next_sunday_9am(now):
+    """Get the first Sunday 9 AM strictly after `now`."""
+    days = (6 - now.weekday()) % 7
+    target = (now + timedelta(days=days)).replace(hour=9, minute=0, second=0, microsecond=0)
+    if target <= now:
+        target += timedelta(days=7)
+    return target
 
-    # Check if it's Sunday at 9 AM
-    if now.weekday() == 6 and now.hour == 9:
-        data = load_data()
 
-        # Get the report channel
-        channel_id = data.get("report_channel") or REPORT_CHANNEL_ID
+async def post_weekly_report():
+    """Post the weekly report to the report channel."""
+    data = await get_data_async()
 
-        if channel_id:
-            channel = bot.get_channel(int(channel_id))
-            if channel:
-                report = generate_weekly_report(data)
-                await channel.send("📢 **WEEKLY REPORT - Sunday Update**")
-                await channel.send(report)
-                print(f"✅ Weekly report posted to #{channel.name}")
+    # Get the report channel
+    channel_id = data.get("report_channel") or REPORT_CHANNEL_ID
+
+    if channel_id:
+        channel = bot.get_channel(int(channel_id))
+        if channel:
+            report = generate_weekly_report(data)
+            await channel.send("📢 **WEEKLY REPORT - Sunday Update**")
+            await channel.send(report)
+            print(f"✅ Weekly report posted to #{channel.name}")
+
+
+async def sunday_report_loop():
+    """Automatically post weekly report every Sunday at 9 AM."""
+    target = next_sunday_9am(datetime.now())
+    while True:
+        await asyncio.sleep(max(0, (target - datetime.now()).total_seconds()))
+        try:
+            await post_weekly_report()
+        except Exception as e:
+            print(f"❌ Failed to post weekly report: {e}")
+        target = next_sunday_9am(target)
 
 
 # ============== Slash Commands ==============
@@ -341,11 +580,12 @@ async def sunday_report():
 )
 async def setup(interaction: discord.Interaction, member1: str, member2: str, member3: str, member4: str):
     """Set up the 4 members for tracking."""
-    data = load_data()
+    data = await get_data_async()
     members = [m.lower().replace("@", "") for m in [member1, member2, member3, member4]]
     data["members"] = members
+    data["_members_set"] = set(members)
     data["report_channel"] = interaction.channel_id
-    save_data(data)
+    schedule_save()
 
     await interaction.response.send_message(
         f"✅ **Bot Setup Complete!**\n\n"
@@ -363,17 +603,16 @@ async def setup(interaction: discord.Interaction, member1: str, member2: str, me
 @app_commands.describe(name="Member name to add")
 async def addmember(interaction: discord.Interaction, name: str):
     """Add a member to the tracking list."""
-    data = load_data()
+    data = await get_data_async()
     name = name.lower().replace("@", "")
 
-    if name in data.get("members", []):
+    if name in data["_members_set"]:
         await interaction.response.send_message(f"⚠️ **@{name}** is already in the list!")
         return
 
-    if "members" not in data:
-        data["members"] = []
+    data["_members_set"].add(name)
     data["members"].append(name)
-    save_data(data)
+    schedule_save()
 
     await interaction.response.send_message(f"✅ Added **@{name}** to the member list!")
 
@@ -382,15 +621,16 @@ async def addmember(interaction: discord.Interaction, name: str):
 @app_commands.describe(name="Member name to remove")
 async def removemember(interaction: discord.Interaction, name: str):
     """Remove a member from the tracking list."""
-    data = load_data()
+    data = await get_data_async()
     name = name.lower().replace("@", "")
 
-    if name not in data.get("members", []):
+    if name not in data["_members_set"]:
         await interaction.response.send_message(f"⚠️ **@{name}** is not in the list!")
         return
 
+    data["_members_set"].discard(name)
     data["members"].remove(name)
-    save_data(data)
+    schedule_save()
 
     await interaction.response.send_message(f"✅ Removed **@{name}** from the member list!")
 
@@ -398,7 +638,7 @@ async def removemember(interaction: discord.Interaction, name: str):
 @bot.tree.command(name="members", description="Show all members")
 async def members(interaction: discord.Interaction):
     """Show all tracked members."""
-    data = load_data()
+    data = await get_data_async()
     member_list = data.get("members", [])
 
     if not member_list:
@@ -414,40 +654,40 @@ async def members(interaction: discord.Interaction):
 @bot.tree.command(name="today", description="Show today's collection summary")
 async def today(interaction: discord.Interaction):
     """Show today's payment summary."""
-    data = load_data()
+    data = await get_data_async()
     now = datetime.now()
     date_str = now.strftime("%Y-%m-%d")
     day_name = DAYS[now.weekday()]
 
-    today_payments = [p for p in data["payments"] if p["date"] == date_str]
+    today_payments = data["_by_date"].get(date_str, [])
 
-    response = f"📊 **Today's Summary ({day_name}, {date_str})**\n"
-    response += "-" * 30 + "\n"
+    chunks = [f"📊 **Today's Summary ({day_name}, {date_str})**", "-" * 30]
 
     if not today_payments:
-        response += "No payments recorded today.\n"
+        chunks.append("No payments recorded today.")
     else:
         total = 0
         for p in today_payments:
-            response += f"• @{p['username']}: ${p['amount']:.2f}\n"
+            chunks.append(f"• @{p['username']}: ${p['amount']:.2f}")
             total += p['amount']
-        response += "-" * 30 + "\n"
-        response += f"**Today's Total: ${total:.2f}**\n"
+        chunks.append("-" * 30)
+        chunks.append(f"**Today's Total: ${total:.2f}**")
 
     # Pending
     paid_users = set(p['username'] for p in today_payments)
     pending = [m for m in data.get("members", []) if m not in paid_users]
 
     if pending:
-        response += f"\n⏳ **Pending:** {', '.join('@' + u for u in pending)}"
+        chunks.append("")
+        chunks.append(f"⏳ **Pending:** {', '.join('@' + u for u in pending)}")
 
-    await interaction.response.send_message(response)
+    await interaction.response.send_message("\n".join(chunks))
 
 
 @bot.tree.command(name="report", description="Generate weekly report")
 async def report(interaction: discord.Interaction):
     """Generate and show the weekly report."""
-    data = load_data()
+    data = await get_data_async()
     report_text = generate_weekly_report(data)
 
     await interaction.response.send_message(report_text)
@@ -456,9 +696,7 @@ async def report(interaction: discord.Interaction):
 @bot.tree.command(name="clear", description="Clear all payment data (admin only)")
 async def clear(interaction: discord.Interaction):
     """Clear all payment data for new week."""
-    data = load_data()
-    data["payments"] = []
-    save_data(data)
+    await clear_payments()
 
     await interaction.response.send_message("✅ All payment data cleared! Ready for new week.")
 
@@ -499,4 +737,8 @@ if __name__ == "__main__":
         print("Please create a .env file with your Discord bot token.")
         exit(1)
 
+    # Don't lose changes still waiting for their delayed write
+    atexit.register(flush_data_sync)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
     bot.run(TOKEN)